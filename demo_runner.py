@@ -44,10 +44,11 @@ def main():
     result = swarm.seal_and_export()
     
     # 将 Swarm 结果合并回主链 (调用了优化后的 update_global_with_swarm)
-    new_global_t = update_global_with_swarm(acc, result)
+    new_global_t, swarm_agent = update_global_with_swarm(acc, result)
     state.meta.trace_t = new_global_t
     state.meta.depth = acc.depth
-    state.meta.path_log.append("Research_Team")
+    # 记录实际进入主链的复合 id，路径才能被 TraceInspector 重放
+    state.meta.path_log.append(swarm_agent)
     
     print(f"✅ Swarm 合并完成: {state.summary()}")
     
@@ -1,6 +1,8 @@
+import os
 import time
+from array import array
 import statistics
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from .core import CryptoContext, PrimeRegistry
 from .scopes import ParallelScope
 
@@ -8,28 +10,68 @@ class HolographicBenchmark:
     """
     [Phase 5] 极限压力测试 (适配 Rust 核心版)
     """
+    # 碰撞检测 Bloom 过滤器的位数 (2^24 bit = 2 MiB)
+    COLLISION_FILTER_BITS = 1 << 24
+
     def __init__(self, context, registry_ref):
         self.ctx = context
         self.reg = registry_ref
-        self.timings = []
-        self.collision_set = set()
-        
+        # [Perf] 以整数纳秒记录，避免每次调用的浮点换算与 float 对象分配
+        self.timings_ns = array('q')
+        # [Perf] 以定长位图替代保存完整 2048-bit 整数的 set
+        self._collision_bits = bytearray(self.COLLISION_FILTER_BITS // 8)
+        self.warmup()
+
+    def warmup(self):
+        """
+        [Perf] 计时开始前预热 Rust 扩展 (首次 FFI 调用、素数生成与模幂路径)，
+        预热产生的缓存条目与计时样本全部丢弃，保证各次运行结果可比
+        """
+        # 一次性注册表：不占用 self.reg 的限流额度，也不在其中留下素数条目
+        PrimeRegistry(self.ctx).register_agent("__warmup__")
+        self.ctx.fast_pow(2, 3)
+        self.timings_ns = array('q')
+
+    def _seen_before(self, t):
+        """
+        Bloom 过滤器 (k=2)：取 T 低 48 位的两段 24-bit 切片作为两个独立哈希
+        T 本身是模 M 的均匀分布值，无需再做额外哈希
+        """
+        mask = self.COLLISION_FILTER_BITS - 1
+        low = t & 0xFFFFFFFFFFFF
+        seen = True
+        for idx in (low & mask, (low >> 24) & mask):
+            byte, bit = idx >> 3, 1 << (idx & 7)
+            if not self._collision_bits[byte] & bit:
+                seen = False
+                self._collision_bits[byte] |= bit
+        return seen
+
     def _simulate_op(self, t_curr, agent_name, depth):
         # 这里的模拟操作用于验证数学正确性，因此保留 Python 原生实现逻辑
         # 但调用了确定性的 PrimeRegistry (基于 Rust)
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         p = self.reg.register_agent(agent_name)
         
-        # 注意：这里我们依然用 Python 的 pow 进行对比测试
+        # 注意：这里我们依然用 Python 侧的模幂 (ctx.powmod) 进行对比测试
         # 如果想测试纯 Rust 链路，请参考 run_system_test
-        path_term = pow(t_curr, p, self.ctx.M)
-        depth_hash = int(hashlib.sha256(str(depth).encode()).hexdigest(), 16)
-        depth_term = pow(self.ctx.G, depth_hash, self.ctx.M)
-        t_next = (path_term * depth_term) % self.ctx.M
+        M = self.ctx.M
+        path_term = self.ctx.powmod(t_curr, p)
+        # G^H(depth) 与 T 无关，由 CryptoContext 按 depth 缓存
+        depth_term = self.ctx.depth_term(depth)
+        t_next = (path_term * depth_term) % M
         
-        self.timings.append((time.perf_counter() - start) * 1000)
+        self.timings_ns.append(time.perf_counter_ns() - start)
         return t_next
 
+    @staticmethod
+    def _report_system_test(label, iterations, total_ns, latencies_ns):
+        # 系统级测试共用的汇总输出；计时全部为整数纳秒，只在打印时换算
+        total_s = total_ns / 1e9
+        print(f"✅ {label} Finished. Total Time: {total_s:.4f}s")
+        print(f"   Avg Latency (Rust): {statistics.mean(latencies_ns) / 1e6:.4f} ms")
+        print(f"   Throughput: {iterations / total_s:.2f} ops/sec")
+
     def run_system_test(self, iterations=100):
         """
         [New] 系统级测试：直接调用 Rust 封装好的累加器，测试真实的生产环境性能
@@ -39,25 +81,55 @@ class HolographicBenchmark:
         print(f"🔥 [System Test] Start N={iterations} | Rust Backend Active")
         acc = HolographicAccumulator(self.ctx)
         
-        start_time = time.time()
-        latencies = []
+        start_ns = time.perf_counter_ns()
+        latencies_ns = array('q')
         
         for i in range(iterations):
-            t0 = time.perf_counter()
+            t0 = time.perf_counter_ns()
             # 直接调用 Rust 封装接口
             acc.update_state(f"Agent_{i}")
-            latencies.append((time.perf_counter() - t0) * 1000)
+            latencies_ns.append(time.perf_counter_ns() - t0)
+            
+        self._report_system_test("System Test", iterations, time.perf_counter_ns() - start_ns, latencies_ns)
+
+    def run_threaded_system_test(self, iterations=100, workers=None):
+        """
+        [Perf] 多线程系统级测试：Rust 在模幂期间释放 GIL，
+        每个线程驱动独立的累加器实例，吞吐随核心数扩展
+        """
+        from .core import HolographicAccumulator
+        
+        workers = workers or os.cpu_count() or 1
+        print(f"🔥 [Threaded System Test] Start N={iterations} | Workers={workers}")
+        # 状态转移是串行依赖的，因此每个线程持有独立的累加器
+        accs = [HolographicAccumulator(self.ctx) for _ in range(workers)]
+        
+        def drive(worker_idx):
+            acc = accs[worker_idx]
+            latencies_ns = array('q')
+            for i in range(worker_idx, iterations, workers):
+                t0 = time.perf_counter_ns()
+                acc.update_state(f"Agent_{i}")
+                latencies_ns.append(time.perf_counter_ns() - t0)
+            return latencies_ns
+        
+        start_ns = time.perf_counter_ns()
+        latencies_ns = array('q')
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(drive, range(workers)):
+                latencies_ns.extend(chunk)
             
-        total_time = time.time() - start_time
-        print(f"✅ System Test Finished. Total Time: {total_time:.4f}s")
-        print(f"   Avg Latency (Rust): {statistics.mean(latencies):.4f} ms")
-        print(f"   Throughput: {iterations / total_time:.2f} ops/sec")
+        self._report_system_test("Threaded System Test", iterations, time.perf_counter_ns() - start_ns, latencies_ns)
 
     def run(self, iterations=100):
         print(f"⚠️ [Simulation] Running Python-side validation logic (Slower)...")
         print(f"🔥 [Benchmark] Start N={iterations} | Bits={self.ctx.M.bit_length()}")
         start_time = time.time()
         
+        # [Perf] Scope 与 Worker 名称在循环外一次性创建，循环内仅 reset
+        workers = ("Worker_A", "Worker_B", "Worker_C")
+        scope = ParallelScope(self.ctx, self.reg, 0, 0)
+        
         for i in range(iterations):
             # 模拟：Root -> Parallel(3 branches) -> End
             curr_t = 2 + i
@@ -67,16 +139,14 @@ class HolographicBenchmark:
             
             # Parallel Scope
             # 这里的 scope.merge() 已经使用了 Rust 加速
-            scope = ParallelScope(self.ctx, self.reg, curr_t, depth)
-            scope.add_branch_result("Worker_A")
-            scope.add_branch_result("Worker_B")
-            scope.add_branch_result("Worker_C")
-            curr_t, depth = scope.merge()
+            scope.reset(curr_t, depth)
+            for w in workers:
+                scope.add_branch_result(w)
+            curr_t, depth, _ = scope.merge()
             
-            if curr_t in self.collision_set:
-                print("💥 Collision detected!")
-            self.collision_set.add(curr_t)
+            if self._seen_before(curr_t):
+                print("💥 Collision detected! (Bloom hit)")
             
         print(f"✅ Simulation Finished. Total Time: {time.time() - start_time:.4f}s")
-        if self.timings:
-            print(f"   Avg Latency (Python logic): {statistics.mean(self.timings):.4f} ms")
+        if self.timings_ns:
+            print(f"   Avg Latency (Python logic): {statistics.mean(self.timings_ns) / 1e6:.4f} ms")
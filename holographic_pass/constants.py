@@ -0,0 +1,4 @@
+# 跨模块共享的协议常量：core 与 security 都从这里导入，core 不依赖验证模块
+
+# TraceInspector 单次验证允许的模幂次数上限 (每步 2 次)；core 中的 H(depth) 预计算表按此取长度
+MAX_VERIFY_OPS = 5000
@@ -1,11 +1,50 @@
-import json
-import secrets
+from hashlib import blake2b, sha256
+import logging
+import sys
 import uuid
 import time
+from array import array
+from collections import deque
+from typing import final
 from holographic_core import RustAccumulator
+from .constants import MAX_VERIFY_OPS
 
+try:
+    # 可选加速：gmpy2 (GMP) 提供 Karatsuba/Toom 乘法与 Montgomery 约简的模运算
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+logger = logging.getLogger(__name__)
+
+def _hash_depth(depth):
+    # 编码保持十进制字符串：与 Rust 侧 _compute_transition 的 H(depth) 一致
+    return int.from_bytes(sha256(str(depth).encode()).digest(), "big")
+
+# [Perf] H(depth) 表在导入时一次性算好：覆盖 TraceInspector 的复杂度上限
+# (MAX_VERIFY_OPS，每步 2 次)，约 2500 次短消息 SHA-256，耗时在毫秒级
+_DEPTH_HASHES = tuple(_hash_depth(d) for d in range(MAX_VERIFY_OPS // 2 + 1))
+
+def _le_bytes(n):
+    # FFI 边界上大整数的规范表示：小端字节 (与 Rust 侧 Order::Lsf 对应)
+    return n.to_bytes((n.bit_length() + 7) // 8, "little")
+
+@final
 class CryptoContext:
+    # [Perf] 热路径包装类使用 __slots__：属性访问走描述符而非实例 __dict__
+    __slots__ = ("MAX_DEPTH", "DOMAIN", "M_bytes", "M", "G", "G_bytes", "_prime_helper", "_G_pow_table",
+                 "_depth_term_cache", "_M_mpz")
+
+    # 固定底数 G 的窗口表参数：覆盖 SHA-256 结构哈希的 256-bit 指数
+    # w=5：每次 pow_G 52 次乘法，表共 52x32 项 (约 400 KiB @2048-bit)
+    FIXED_BASE_WINDOW = 5
+    FIXED_BASE_EXP_BITS = 256
+
     def __init__(self, bit_length=2048, max_depth=10, setup_mode="production", domain_id=None):
+        # 模数只在 Rust 侧生成，不存在其他 setup 路径
+        if setup_mode != "production":
+            raise ValueError(f"Unsupported setup_mode: {setup_mode!r} (only 'production' is available)")
+        
         self.MAX_DEPTH = max_depth
         self.DOMAIN = str(domain_id) if domain_id else str(uuid.uuid4())
         
@@ -16,84 +55,271 @@ class CryptoContext:
         print("🔐 [Security] Delegating Safe Modulus Generation to Rust Core...")
         try:
             # bit_length 必须传递给 Rust
-            self.M_str = RustAccumulator.generate_safe_modulus(bit_length)
-            self.M = int(self.M_str)
+            # [Perf] 模数只保留 int 与小端字节两种表示，不再经过十进制字符串
+            self.M_bytes = RustAccumulator.generate_safe_modulus(bit_length)
+            self.M = int.from_bytes(self.M_bytes, "little")
             self.G = 4
-            self.G_str = str(self.G)
+            self.G_bytes = _le_bytes(self.G)
         except Exception as e:
             print(f"🔥 [CRITICAL] Modulus generation failed: {e}")
             raise
         
         try:
-            self._prime_helper = RustAccumulator(self.M_str, self.G_str, self.MAX_DEPTH, self.DOMAIN)
+            self._prime_helper = RustAccumulator(self.M_bytes, self.G_bytes, self.MAX_DEPTH, self.DOMAIN)
         except Exception as e:
             print(f"🔥 [CRITICAL] Failed to init Rust core: {e}")
             raise
 
+        # Python 侧模运算使用的模数 (gmpy2 可用时为 mpz)
+        self._M_mpz = gmpy2.mpz(self.M) if gmpy2 is not None else self.M
+        # [Perf] 预计算 G^(k·2^(w·i)) 表，固定底数模幂只需查表相乘，无需平方
+        self._G_pow_table = self._build_fixed_base_table()
+        # [Perf] G^H(depth) 只依赖 depth，按需计算后缓存 (快照折叠会让 depth 从 0 重新开始)
+        # 累加器的 depth 不会超过 MAX_DEPTH，这一段在初始化时预先填好，稳态下不再做 SHA-256
+        self._depth_term_cache = {}
+        for d in range(self.MAX_DEPTH + 1):
+            self.depth_term(d)
+
     def fast_pow(self, base, exp):
-        return int(RustAccumulator.safe_pow_mod(str(base), str(exp), self.M_str))
+        # [Perf] 走绑定固定模数 M 的实例方法，省去每次调用对 M 的传递与解析
+        return int.from_bytes(self._prime_helper.pow_mod(_le_bytes(base), _le_bytes(exp)), "little")
+
+    def powmod(self, base, exp):
+        # Python 侧的变底数模幂：gmpy2 可用时交给 GMP，否则退回 CPython pow
+        if gmpy2 is not None:
+            return int(gmpy2.powmod(base, exp, self._M_mpz))
+        return pow(base, exp, self.M)
+
+    def depth_term(self, depth):
+        term = self._depth_term_cache.get(depth)
+        if term is None:
+            depth_hash = _DEPTH_HASHES[depth] if depth < len(_DEPTH_HASHES) else _hash_depth(depth)
+            term = self._depth_term_cache[depth] = self.pow_G(depth_hash)
+        return term
+
+    def _build_fixed_base_table(self):
+        w = self.FIXED_BASE_WINDOW
+        M = self._M_mpz
+        table = []
+        base = self.G % M
+        for _ in range((self.FIXED_BASE_EXP_BITS + w - 1) // w):
+            row = [1]
+            for _ in range((1 << w) - 1):
+                row.append(row[-1] * base % M)
+            table.append(row)
+            # 下一窗口的底数 base^(2^w)
+            base = row[-1] * base % M
+        return table
+
+    def pow_G(self, exp):
+        if exp < 0 or exp.bit_length() > self.FIXED_BASE_EXP_BITS:
+            return pow(self.G, exp, self.M)
+        
+        # 约简直接使用 % M：纯 Python 的 Montgomery REDC 需要两次额外大数乘法，
+        # 在 2048-bit 下比 CPython 的长除法更慢；状态转移中的模幂由 Rust/GMP 完成，
+        # 而 GMP 的 mpz_powm 内部已使用 Montgomery 约简
+        w = self.FIXED_BASE_WINDOW
+        mask = (1 << w) - 1
+        M = self._M_mpz
+        result = 1
+        for row in self._G_pow_table:
+            if not exp:
+                break
+            digit = exp & mask
+            if digit:
+                result = result * row[digit] % M
+            exp >>= w
+        return int(result)
 
 class PrimeRegistry:
+    __slots__ = ("ctx", "_id_to_idx", "_primes", "request_log", "RATE_LIMIT_WINDOW", "MAX_REQUESTS_PER_WINDOW")
+
     def __init__(self, context):
         self.ctx = context
-        self.cache = {}
+        # [Perf] agent_id -> 下标，素数按注册顺序存放在连续列表中
+        # 验证路径可一次性解析出下标，循环内只做列表索引
+        self._id_to_idx = {}
+        self._primes = []
         # [Security Fix #4] 请求限流 (Rate Limiting)
-        self.request_log = {}
+        # [Perf] 滑动窗口内的请求时间戳队列，过期清理为均摊 O(1)
+        self.request_log = deque()
         self.RATE_LIMIT_WINDOW = 1.0 # 1秒
         self.MAX_REQUESTS_PER_WINDOW = 100 
     
-    def register_agent(self, agent_id):
+    def _throttle(self, n_requests=1):
         # DoS Protection: Rate Limiting
         now = time.time()
-        # 简单清理过期记录
-        self.request_log = {k: v for k, v in self.request_log.items() if now - v < self.RATE_LIMIT_WINDOW}
+        log = self.request_log
+        # 从队头弹出过期记录
+        while log and now - log[0] >= self.RATE_LIMIT_WINDOW:
+            log.popleft()
         
         # 全局限流 (简单实现，实际应针对 IP 或 Session)
-        if len(self.request_log) > self.MAX_REQUESTS_PER_WINDOW:
+        # 批量请求按其全部条数计入：单次调用同样不能超过窗口上限，超限时整批拒绝，
+        # 不会进入 hash_to_prime_many
+        if len(log) + n_requests > self.MAX_REQUESTS_PER_WINDOW:
              raise RuntimeError("Rate Limit Exceeded: Too many prime generation requests")
         
-        self.request_log[agent_id] = now
+        log.extend([now] * n_requests)
 
-        if agent_id in self.cache:
-            return self.cache[agent_id]
+    def _store(self, agent_id, p_buf):
+        # [Perf] 驻留字符串键：后续以同一对象查找时字典比较在身份判断处短路
+        if type(agent_id) is str:
+            agent_id = sys.intern(agent_id)
+        idx = self._id_to_idx[agent_id] = len(self._primes)
+        self._primes.append(int.from_bytes(p_buf, "little"))
+        return idx
+
+    def register_agent(self, agent_id):
+        # [Perf] 命中路径只做一次字典查找
+        idx = self._id_to_idx.get(agent_id)
+        if idx is not None:
+            return self._primes[idx]
         
+        # 仅对真正触发素数生成的请求限流，缓存命中不计入窗口
+        self._throttle()
         try:
-            p_str = self.ctx._prime_helper.hash_to_prime(str(agent_id))
-            p = int(p_str)
-            self.cache[agent_id] = p
-            return p
+            p_buf = self.ctx._prime_helper.hash_to_prime(str(agent_id))
+            return self._primes[self._store(agent_id, p_buf)]
         except ValueError as e:
              print(f"❌ Prime generation failed for {agent_id}: {e}")
              raise
 
-    def get_prime(self, agent_id):
-        return self.register_agent(agent_id)
+    def register_indices(self, agent_ids):
+        # [Perf] 批量注册：过滤已注册的 ID 后，仅对未命中的 ID 发起一次 FFI 调用
+        agent_ids = list(agent_ids)
+        id_to_idx = self._id_to_idx
+        missing = list(dict.fromkeys(a for a in agent_ids if a not in id_to_idx))
+        if missing:
+            self._throttle(len(missing))
+            try:
+                p_bufs = self.ctx._prime_helper.hash_to_prime_many([str(a) for a in missing])
+            except ValueError as e:
+                print(f"❌ Bulk prime generation failed: {e}")
+                raise
+            for agent_id, p_buf in zip(missing, p_bufs):
+                self._store(agent_id, p_buf)
+
+        return [id_to_idx[a] for a in agent_ids]
+
+    def register_agents(self, agent_ids):
+        primes = self._primes
+        return [primes[i] for i in self.register_indices(agent_ids)]
+
+    def get_prime_by_idx(self, idx):
+        return self._primes[idx]
+
+    # 验证热路径直接绑定到 register_agent，省去一层 Python 调用
+    get_prime = register_agent
 
 class HolographicAccumulator:
-    def __init__(self, context):
+    __slots__ = ("ctx", "_backend", "_T_buf", "current_T", "depth", "history_sink",
+                 "_hist_limit", "_hist_count", "_hist_width", "_hist_depth", "_hist_ops",
+                 "_hist_agent", "_hist_folded", "_hist_T", "_hist_compact")
+
+    # _hist_folded 中表示 "该记录没有 folded 字段" 的取值
+    _NO_FOLD_FLAG = 2
+    FINGERPRINT_SIZE = 16
+
+    def __init__(self, context, history_limit=10_000, history_sink=None):
         self.ctx = context
-        self._backend = RustAccumulator(context.M_str, context.G_str, context.MAX_DEPTH, context.DOMAIN)
+        self._backend = RustAccumulator(context.M_bytes, context.G_bytes, context.MAX_DEPTH, context.DOMAIN)
         
-        self.current_T = int(self._backend.get_state(), 16)
+        # 缓存 Rust 返回的定宽状态字节，供历史记录直接保存
+        self._T_buf = self._backend.get_state()
+        self.current_T = int.from_bytes(self._T_buf, "little")
         self.depth = self._backend.get_depth()
-        self.history = []
+        # [Perf] 有界历史：超过 history_limit 的旧记录按环形缓冲区覆盖；None 表示不设上限，0 表示不保留
+        # 设置 history_sink 时每条记录交给外部处理，进程内不再保留
+        # 按字段分列存储 (SoA)：T 直接保存 Rust 返回的定宽字节，写入一条记录不分配 dict 与大整数
+        self.history_sink = history_sink
+        self._hist_limit = history_limit
+        self._hist_count = 0
+        self._hist_width = len(self._T_buf)
+        self._hist_depth = array('Q')
+        self._hist_ops = array('Q')
+        self._hist_agent = []
+        self._hist_folded = bytearray()
+        self._hist_T = bytearray()
+        self._hist_compact = False
+
+    def _record(self, agent_id, ops, folded=None):
+        if self.history_sink is not None:
+            entry = {'depth': self.depth, 'agent': agent_id, 'T': self.current_T, 'ops': ops}
+            if folded is not None:
+                entry['folded'] = folded
+            self.history_sink(entry)
+            return
+        
+        limit = self._hist_limit
+        if limit == 0:
+            return
+        flag = self._NO_FOLD_FLAG if folded is None else int(folded)
+        t = self._T_buf
+        if self._hist_compact:
+            # 已压缩为指纹模式，新记录同样只保留指纹
+            t = blake2b(t, digest_size=self.FINGERPRINT_SIZE).digest()
+        
+        if limit is None or self._hist_count < limit:
+            self._hist_depth.append(self.depth)
+            self._hist_ops.append(ops)
+            self._hist_agent.append(agent_id)
+            self._hist_folded.append(flag)
+            self._hist_T += t
+        else:
+            slot, w = self._hist_count % limit, self._hist_width
+            self._hist_depth[slot] = self.depth
+            self._hist_ops[slot] = ops
+            self._hist_agent[slot] = agent_id
+            self._hist_folded[slot] = flag
+            self._hist_T[slot * w:(slot + 1) * w] = t
+        self._hist_count += 1
+
+    @property
+    def history(self):
+        """按时间顺序惰性生成历史记录 dict，T 在取用时才从字节还原"""
+        n = len(self._hist_agent)
+        first = self._hist_count % n if self._hist_count > n else 0
+        w = self._hist_width
+        compact = self._hist_compact
+        for k in range(n):
+            i = (first + k) % n
+            t = bytes(self._hist_T[i * w:(i + 1) * w])
+            entry = {
+                'depth': self._hist_depth[i],
+                'agent': self._hist_agent[i],
+                'T': t if compact else int.from_bytes(t, "little"),
+                'ops': self._hist_ops[i],
+            }
+            if self._hist_folded[i] != self._NO_FOLD_FLAG:
+                entry['folded'] = bool(self._hist_folded[i])
+            yield entry
+
+    def compact_history(self):
+        # 将已保留记录中的完整 T 替换为 BLAKE2b 指纹，之后的新记录也只保留指纹
+        if self._hist_compact:
+            return
+        w, size = self._hist_width, self.FINGERPRINT_SIZE
+        slab = self._hist_T
+        self._hist_T = bytearray().join(
+            blake2b(slab[i:i + w], digest_size=size).digest() for i in range(0, len(slab), w)
+        )
+        self._hist_width = size
+        self._hist_compact = True
 
     def update_state(self, agent_id):
         try:
             # [Security Fix #2] 传递 expected_prev_t 防止回滚
-            t_next_str = self._backend.update_state(
+            # expected_prev_t 取自 current_T 而非缓存的 _T_buf：current_T 被篡改或与后端不同步时
+            # Rust 侧能检测到不一致并拒绝
+            # [Perf] depth 与 op_count 随状态一并返回，每步只跨一次 FFI
+            self._T_buf, self.depth, ops = self._backend.update_state(
                 str(agent_id), 
-                str(self.current_T)
+                _le_bytes(self.current_T)
             )
-            self.current_T = int(t_next_str)
-            self.depth = self._backend.get_depth()
+            self.current_T = int.from_bytes(self._T_buf, "little")
             
-            self.history.append({
-                'depth': self.depth, 
-                'agent': agent_id, 
-                'T': self.current_T,
-                'ops': self._backend.get_op_count()
-            })
+            self._record(agent_id, ops)
             return self.current_T
         except Exception as e:
             print(f"⚠️ State Update Failed: {e}")
@@ -103,8 +329,10 @@ class HolographicAccumulator:
         return self._backend.get_op_count()
 
 class SnapshotAccumulator(HolographicAccumulator):
-    def __init__(self, context):
-        super().__init__(context)
+    __slots__ = ("snapshot_store", "segment_id", "last_snapshot_hash")
+
+    def __init__(self, context, history_limit=10_000, history_sink=None):
+        super().__init__(context, history_limit, history_sink)
         self.snapshot_store = []
         self.segment_id = 0
         self.last_snapshot_hash = "0" * 64 
@@ -112,19 +340,18 @@ class SnapshotAccumulator(HolographicAccumulator):
     def update_state_with_check(self, agent_id, agent_prime=None):
         try:
             # [Security Fix #2] 同样传递 expected_prev_t
-            new_t_str, is_folded, snapshot_data = self._backend.update_with_snapshot(
+            self._T_buf, is_folded, snapshot_block, self.depth, ops = self._backend.update_with_snapshot(
                 str(agent_id), 
                 self.segment_id,
                 self.last_snapshot_hash,
-                str(self.current_T) 
+                _le_bytes(self.current_T)
             )
             
-            self.current_T = int(new_t_str)
-            self.depth = self._backend.get_depth()
+            self.current_T = int.from_bytes(self._T_buf, "little")
             
             if is_folded:
-                block = json.loads(snapshot_data)
-                block["timestamp"] = __import__("time").time()
+                block = snapshot_block
+                block["timestamp"] = time.time()
                 
                 if block.get("prev_hash") != self.last_snapshot_hash:
                      raise RuntimeError("Snapshot Chain Integrity Violation!")
@@ -132,16 +359,11 @@ class SnapshotAccumulator(HolographicAccumulator):
                 self.snapshot_store.append(block)
                 self.last_snapshot_hash = block["snapshot_hash"]
                 
-                print(f"💾 [Snapshot] Block #{self.segment_id} Linked & Sealed.")
+                # [Perf] 折叠处于热路径：日志级别未开启时不做任何格式化
+                logger.debug("💾 [Snapshot] Block #%d Linked & Sealed.", self.segment_id)
                 self.segment_id += 1
             
-            self.history.append({
-                'depth': self.depth,
-                'agent': agent_id,
-                'T': self.current_T,
-                'folded': is_folded,
-                'ops': self._backend.get_op_count()
-            })
+            self._record(agent_id, ops, is_folded)
             return self.current_T
         except Exception as e:
              print(f"⚠️ Snapshot Update Failed: {e}")
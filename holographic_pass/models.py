@@ -22,4 +22,5 @@ class AgentState:
     timestamp: float = field(default_factory=time.time)
     
     def summary(self):
-        return f"[State] Depth: {self.meta.depth} | Ops: {self.meta.total_op_count} | T: {str(self.meta.trace_t)[:10]}..."
+        # 十六进制转换对位数线性，2048-bit 整数转十进制则是二次复杂度
+        return f"[State] Depth: {self.meta.depth} | Ops: {self.meta.total_op_count} | T: {hex(self.meta.trace_t)[:12]}..."
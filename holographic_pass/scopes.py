@@ -1,5 +1,7 @@
-import hashlib
+# OpenSSL sha256，硬件 SHA 扩展由 OpenSSL 自动分派 (见 security.py)
+from hashlib import sha256
 from holographic_core import RustAccumulator
+from .core import _le_bytes
 
 class SwarmScope:
     def __init__(self, swarm_name, parent_context, registry_ref):
@@ -7,33 +9,53 @@ class SwarmScope:
         self.ctx = parent_context
         self.reg = registry_ref
         
-        self._backend = RustAccumulator(self.ctx.M_str, self.ctx.G_str, self.ctx.MAX_DEPTH, self.ctx.DOMAIN)
-        self.swarm_prime = self.reg.register_agent(swarm_name)
+        # 主链上的有效素数由 update_global_with_swarm 的复合 id 派生，这里不再为 swarm_name 注册素数
+        self._backend = RustAccumulator(self.ctx.M_bytes, self.ctx.G_bytes, self.ctx.MAX_DEPTH, self.ctx.DOMAIN)
 
     def track_sub_task(self, sub_agent_name):
         # [Security Fix #2] 获取当前 Rust 状态作为 expected_prev_t
         # 虽然这看起来是多余的（自己查自己），但在 FFI 边界这是一种良好的断言机制
         # 实际场景中，prev_t 可能来自客户端请求的 Proof
-        current_state_hex = self._backend.get_state()
-        current_t = int(current_state_hex, 16)
+        current_state_buf = self._backend.get_state()
         
-        self._backend.update_state(str(sub_agent_name), str(current_t))
+        self._backend.update_state(str(sub_agent_name), current_state_buf)
 
     def seal_and_export(self):
-        local_t = int(self._backend.get_state(), 16)
+        local_t = int.from_bytes(self._backend.get_state(), "little")
         local_depth = self._backend.get_depth()
         op_usage = self._backend.get_op_count()
         
         proof_payload = f"{self.swarm_name}:{local_t}:{local_depth}"
-        work_proof_hash = int(hashlib.sha256(proof_payload.encode()).hexdigest(), 16)
+        work_proof_hash = int.from_bytes(sha256(proof_payload.encode()).digest(), "big")
         
         return {
-            "swarm_prime": self.swarm_prime,
+            "swarm_name": self.swarm_name,
             "work_proof": work_proof_hash,
             "complexity": local_depth,
             "ops": op_usage
         }
 
+def swarm_agent_id(swarm_result):
+    # 工作证明、复杂度与算力消耗一并编码进复合 agent_id，任何一项不同都会派生出不同的素数
+    return (
+        f"{swarm_result['swarm_name']}"
+        f"|proof:{swarm_result['work_proof']:064x}"
+        f"|depth:{swarm_result['complexity']}"
+        f"|ops:{swarm_result['ops']}"
+    )
+
+def update_global_with_swarm(global_acc, swarm_result):
+    """
+    将 Swarm 结算结果注入主链累加器
+    结算结果编码进复合 agent_id，由 Rust 侧 hash_to_prime 派生出有效素数，
+    因此注入只是一次普通的状态转移，复用 update_state 的全部优化与回滚校验
+    返回 (新的 T, 复合 agent_id)：调用方把该 id 记入路径，TraceInspector.verify_path 才能重放主链
+    """
+    composite_id = swarm_agent_id(swarm_result)
+    # 快照累加器走带折叠检查的路径，普通累加器走 update_state
+    update = getattr(global_acc, "update_state_with_check", global_acc.update_state)
+    return update(composite_id), composite_id
+
 class ParallelScope:
     def __init__(self, context, registry_ref, base_t, current_depth):
         self.ctx = context
@@ -41,7 +63,15 @@ class ParallelScope:
         self.base_t = base_t
         self.base_depth = current_depth
         self.branch_ids = []
-        self._computer = self.ctx._prime_helper 
+        # 合并走上下文共享的后端：op_count 计入同一份 DoS 预算，merge_term_cache 跨 scope 复用
+        # (safe_merge_branches 以 &self 执行，可与其他线程中的 pow_mod 同时借用)
+        self._computer = self.ctx._prime_helper
+
+    def reset(self, base_t, current_depth):
+        # [Perf] 复用同一实例进行下一次合并，避免循环内重复构造
+        self.base_t = base_t
+        self.base_depth = current_depth
+        self.branch_ids.clear()
 
     def add_branch_result(self, agent_name):
         self.branch_ids.append(agent_name)
@@ -50,19 +80,19 @@ class ParallelScope:
         if not self.branch_ids:
             return self.base_t, self.base_depth, 0
 
-        primes_str = []
         # [Security Fix #1] Positional Binding + Cascaded Merge
         # Python 侧依然保留 Position ID 以生成不同素数
         # Rust 侧现在执行级联模幂，因此传递的顺序至关重要
-        for idx, agent in enumerate(self.branch_ids):
-            positional_id = f"{agent}#{idx}"
-            p = self.reg.register_agent(positional_id)
-            primes_str.append(str(p))
+        # 注意：不要把分支素数预先乘成单一指数 (prod(P_i)) 再做一次模幂——
+        # 乘积与顺序无关，会重新引入已修复的交换律漏洞
+        # [Perf] 所有分支素数通过一次批量 FFI 调用获取
+        positional_ids = [f"{agent}#{idx}" for idx, agent in enumerate(self.branch_ids)]
+        primes_buf = [_le_bytes(p) for p in self.reg.register_agents(positional_ids)]
             
-        t_final_str, next_depth, ops_cost = self._computer.safe_merge_branches(
-            str(self.base_t), 
-            primes_str, 
+        t_final_buf, next_depth, ops_cost = self._computer.safe_merge_branches(
+            _le_bytes(self.base_t), 
+            primes_buf, 
             self.base_depth
         )
         
-        return int(t_final_str), next_depth, ops_cost
+        return int.from_bytes(t_final_buf, "little"), next_depth, ops_cost
@@ -1,11 +1,15 @@
 use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyDict};
 use rug::{Integer, ops::Pow, integer::Order, rand::RandState};
 use sha2::{Sha256, Digest};
 use rand::{Rng, thread_rng};
-use std::{thread, time::Duration};
+use rayon::prelude::*;
+use std::{collections::HashMap, thread, time::Duration};
+use std::sync::{Mutex, atomic::{AtomicU64, Ordering}};
 use zeroize::Zeroize; // [Security Fix #5] 引入内存擦除特性
 
 const MAX_STRING_LEN: usize = 4096; 
+const DEPTH_TERM_CACHE_LIMIT: usize = 4096;
 
 #[pymodule]
 fn holographic_core(_py: Python, m: &PyModule) -> PyResult<()> {
@@ -20,23 +24,31 @@ struct RustAccumulator {
     depth: u64,
     max_depth: u64,
     generator: Integer,
-    op_count: u64,
+    // 原子计数：safe_merge_branches 只持有 &self，也必须计入同一份 DoS 预算
+    op_count: AtomicU64,
     max_op_limit: u64,
     domain_context: String, 
+    // [Perf] 每个上下文的 G^H(depth) 缓存：模数与生成元在生命周期内固定，depth 取值有限
+    depth_term_cache: HashMap<u64, Integer>,
+    // [Perf] 合并路径的结构项 G^H(depth, idx) 同样只依赖 (depth, idx)，底数 G 固定
+    // 内部可变：合并以 &self 执行，可与释放 GIL 的 pow_mod / hash_to_prime 共用同一实例
+    merge_term_cache: Mutex<HashMap<(u64, u32), Integer>>,
 }
 
 #[pymethods]
 impl RustAccumulator {
+    /// [Perf] 模数与生成元以小端字节传入，避免十进制字符串的 O(n²) 解析
     #[new]
-    fn new(modulus_str: String, generator_str: String, max_depth: u64, domain: String) -> PyResult<Self> {
-        Self::_validate_input(&modulus_str)?;
-        Self::_validate_input(&generator_str)?;
+    fn new(modulus: &[u8], generator: &[u8], max_depth: u64, domain: String) -> PyResult<Self> {
+        Self::_validate_bytes(modulus)?;
+        Self::_validate_bytes(generator)?;
         Self::_validate_input(&domain)?;
         
-        let m = Integer::from_str_radix(&modulus_str, 10)
-            .map_err(|_| pyo3::exceptions::PyValueError::new_err("Invalid modulus format"))?;
-        let g = Integer::from_str_radix(&generator_str, 10)
-            .map_err(|_| pyo3::exceptions::PyValueError::new_err("Invalid generator format"))?;
+        let m = Self::_from_le(modulus);
+        if m <= 1 {
+            return Err(pyo3::exceptions::PyValueError::new_err("Invalid modulus format"));
+        }
+        let g = Self::_from_le(generator);
         
         Ok(RustAccumulator {
             modulus: m,
@@ -44,9 +56,11 @@ impl RustAccumulator {
             depth: 0,
             max_depth: max_depth,
             generator: g,
-            op_count: 0,
+            op_count: AtomicU64::new(0),
             max_op_limit: 1_000_000,
             domain_context: domain,
+            depth_term_cache: HashMap::new(),
+            merge_term_cache: Mutex::new(HashMap::new()),
         })
     }
 
@@ -54,7 +68,7 @@ impl RustAccumulator {
     /// 在 Rust 层生成 p, q 并计算 n，利用 Rust 的所有权机制确保 p, q 离开作用域后被清理
     /// 相比 Python 的 del，这里的内存管理更加确定
     #[staticmethod]
-    fn generate_safe_modulus(bit_length: u32) -> String {
+    fn generate_safe_modulus(py: Python, bit_length: u32) -> PyObject {
         let mut rng = RandState::new();
         let seed = Integer::from(thread_rng().gen::<u64>()); // Random seed
         rng.seed(&seed);
@@ -72,11 +86,12 @@ impl RustAccumulator {
         drop(p);
         drop(q);
         
-        n.to_string_radix(10)
+        Self::_bytes(py, &n.to_digits::<u8>(Order::Lsf))
     }
 
-    fn get_state(&self) -> String {
-        self.current_t.to_string_radix(16)
+    /// [Perf] 状态以定宽小端字节返回 (宽度 = 模数字节数)，Python 侧 int.from_bytes 为 O(n)
+    fn get_state(&self, py: Python) -> PyObject {
+        Self::_bytes(py, &self._to_fixed_le(&self.current_t))
     }
 
     fn get_depth(&self) -> u64 {
@@ -84,54 +99,44 @@ impl RustAccumulator {
     }
     
     fn get_op_count(&self) -> u64 {
-        self.op_count
+        self.op_count.load(Ordering::Relaxed)
     }
 
-    fn hash_to_prime(&mut self, agent_id: String) -> PyResult<String> {
+    fn hash_to_prime(&self, py: Python, agent_id: String) -> PyResult<PyObject> {
         Self::_validate_input(&agent_id)?;
-        self._inject_heavy_jitter(); // [Fix #3] 增强版 Jitter
-        
-        let mut nonce = 0u64;
-        let prefix = format!("{}:", self.domain_context);
-        let prefix_bytes = prefix.as_bytes();
-        let id_bytes = agent_id.as_bytes();
-
-        loop {
-            let mut candidate_bytes: Vec<u8> = Vec::new();
-            for i in 0..4 {
-                let mut hasher = Sha256::new();
-                hasher.update(prefix_bytes);
-                hasher.update(id_bytes);
-                hasher.update(&nonce.to_le_bytes());
-                hasher.update(&(i as u32).to_le_bytes());
-                candidate_bytes.extend_from_slice(&hasher.finalize());
-            }
-
-            let mut candidate = Integer::from_digits(&candidate_bytes, Order::Msf);
-            candidate.set_bit(1023, true); 
-            candidate.set_bit(0, true);
-
-            if candidate.is_probably_prime(64) != rug::integer::IsPrime::No {
-                return Ok(candidate.to_string_radix(10));
-            }
+        let p = self._hash_to_prime_int(&agent_id)?;
+        Ok(Self::_bytes(py, &p.to_digits::<u8>(Order::Lsf)))
+    }
 
-            nonce += 1;
-            if nonce > 200_000 { 
-                 return Err(pyo3::exceptions::PyRuntimeError::new_err("Prime generation timeout (DoS protection)"));
-            }
+    /// [Perf] 批量 Hash-to-Prime
+    /// 一次 FFI 往返完成多个 Agent 的素数映射，循环在 Rust 内部执行并释放 GIL，
+    /// 摊销 PyO3 逐次调用的参数编组与 GIL 切换开销
+    fn hash_to_prime_many(&self, py: Python, agent_ids: Vec<String>) -> PyResult<Vec<PyObject>> {
+        for agent_id in agent_ids.iter() {
+            Self::_validate_input(agent_id)?;
         }
+        let primes = py.allow_threads(|| {
+            agent_ids
+                .iter()
+                .map(|agent_id| self._hash_to_prime_int(agent_id))
+                .collect::<PyResult<Vec<Integer>>>()
+        })?;
+        Ok(primes
+            .iter()
+            .map(|p| Self::_bytes(py, &p.to_digits::<u8>(Order::Lsf)))
+            .collect())
     }
 
     /// [Security Fix #2] 防止状态回滚 (Rollback Protection)
     /// 强制要求传入预期的前序状态 expected_prev_t
-    fn update_state(&mut self, agent_id: String, expected_prev_t: String) -> PyResult<String> {
+    /// [Perf] 一次返回 (state, depth, op_count)，省去 Python 侧随后的两次 getter 调用
+    fn update_state(&mut self, py: Python, agent_id: String, expected_prev_t: &[u8]) -> PyResult<(PyObject, u64, u64)> {
         Self::_validate_input(&agent_id)?;
-        Self::_validate_input(&expected_prev_t)?;
+        Self::_validate_bytes(expected_prev_t)?;
         self._check_op_limit()?;
         
         // 校验状态一致性
-        let prev_t_int = Integer::from_str_radix(&expected_prev_t, 10)
-            .map_err(|_| pyo3::exceptions::PyValueError::new_err("Invalid prev_t format"))?;
+        let prev_t_int = Self::_from_le(expected_prev_t);
             
         if self.current_t != prev_t_int {
             return Err(pyo3::exceptions::PyValueError::new_err(
@@ -141,17 +146,17 @@ impl RustAccumulator {
             ));
         }
         
-        let (next_t, _) = self._compute_transition(agent_id)?;
-        self.current_t = next_t.clone();
+        // [Perf] 模幂期间释放 GIL，允许其他 Python 线程驱动各自的累加器
+        let (next_t, _) = py.allow_threads(|| self._compute_transition(&agent_id))?;
+        self.current_t = next_t;
         self.depth += 1;
-        Ok(next_t.to_string_radix(10))
+        Ok((Self::_bytes(py, &self._to_fixed_le(&self.current_t)), self.depth, self.op_count.load(Ordering::Relaxed)))
     }
 
-    fn update_with_snapshot(&mut self, agent_id: String, segment_id: u64, prev_snapshot_hash: String, expected_prev_t: String) -> PyResult<(String, bool, String)> {
+    fn update_with_snapshot(&mut self, py: Python, agent_id: String, segment_id: u64, prev_snapshot_hash: String, expected_prev_t: &[u8]) -> PyResult<(PyObject, bool, Option<PyObject>, u64, u64)> {
         // 同样加入 expected_prev_t 检查
-        Self::_validate_input(&expected_prev_t)?;
-        let prev_t_int = Integer::from_str_radix(&expected_prev_t, 10)
-             .map_err(|_| pyo3::exceptions::PyValueError::new_err("Invalid prev_t format"))?;
+        Self::_validate_bytes(expected_prev_t)?;
+        let prev_t_int = Self::_from_le(expected_prev_t);
         
         if self.current_t != prev_t_int {
              return Err(pyo3::exceptions::PyValueError::new_err("State Mismatch during snapshot update"));
@@ -161,7 +166,7 @@ impl RustAccumulator {
         Self::_validate_input(&prev_snapshot_hash)?;
         self._check_op_limit()?;
         
-        let (next_t, next_depth) = self._compute_transition(agent_id)?;
+        let (next_t, next_depth) = py.allow_threads(|| self._compute_transition(&agent_id))?;
 
         if next_depth >= self.max_depth {
             let t_str = next_t.to_string_radix(10);
@@ -177,16 +182,20 @@ impl RustAccumulator {
             self.current_t = new_seed.clone();
             self.depth = 0;
             
-            let snapshot_info = format!(
-                r#"{{"segment_id": {}, "final_t": "{}", "snapshot_hash": "{}", "prev_hash": "{}"}}"#,
-                segment_id, t_str, snapshot_hash, prev_snapshot_hash
-            );
+            // [Perf] 直接构造 Python dict，省去 JSON 序列化与 Python 侧 json.loads
+            let snapshot_info = PyDict::new(py);
+            snapshot_info.set_item("segment_id", segment_id)?;
+            snapshot_info.set_item("final_t", t_str)?;
+            snapshot_info.set_item("snapshot_hash", snapshot_hash)?;
+            snapshot_info.set_item("prev_hash", prev_snapshot_hash)?;
             
-            Ok((self.current_t.to_string_radix(10), true, snapshot_info))
+            let t_buf = Self::_bytes(py, &self._to_fixed_le(&self.current_t));
+            Ok((t_buf, true, Some(snapshot_info.into()), self.depth, self.op_count.load(Ordering::Relaxed)))
         } else {
-            self.current_t = next_t.clone();
+            self.current_t = next_t;
             self.depth = next_depth;
-            Ok((self.current_t.to_string_radix(10), false, "".to_string()))
+            let t_buf = Self::_bytes(py, &self._to_fixed_le(&self.current_t));
+            Ok((t_buf, false, None, self.depth, self.op_count.load(Ordering::Relaxed)))
         }
     }
 
@@ -194,82 +203,174 @@ impl RustAccumulator {
     /// 修复了乘法交换律漏洞。现在合并顺序对结果有决定性影响。
     /// T_final = (...((Base^P0 * G^H(0))^P1 * G^H(1))...)
     /// 每一个分支的素数 Pi 都会对当前状态进行模幂，并立即混合结构哈希。
-    fn safe_merge_branches(&mut self, base_t_str: String, primes_str: Vec<String>, base_depth: u64) -> PyResult<(String, u64, u64)> {
-        Self::_validate_input(&base_t_str)?;
+    fn safe_merge_branches(&self, py: Python, base_t: &[u8], prime_bufs: Vec<&[u8]>, base_depth: u64) -> PyResult<(PyObject, u64, u64)> {
+        Self::_validate_bytes(base_t)?;
+        for p_buf in prime_bufs.iter() {
+            Self::_validate_bytes(p_buf)?;
+        }
         self._check_op_limit()?;
         self._inject_heavy_jitter(); 
 
-        let mut current_term = Integer::from_str_radix(&base_t_str, 10)
-             .map_err(|_| pyo3::exceptions::PyValueError::new_err("Invalid base_t format"))?;
-             
-        let mut ops_consumed = 0u64;
-        let mut next_depth = base_depth;
+        let base = Self::_from_le(base_t);
+        let primes: Vec<Integer> = prime_bufs.iter().map(|p_buf| Self::_from_le(p_buf)).collect();
+        let generator = &self.generator;
+        let modulus = &self.modulus;
+        let keys: Vec<(u64, u32)> = (0..primes.len())
+            .map(|idx| (base_depth + 1 + idx as u64, idx as u32))
+            .collect();
+        // 锁只在查表与回填时持有，模幂期间不持锁
+        let cached: Vec<Option<Integer>> = {
+            let cache = self.merge_term_cache.lock().unwrap();
+            keys.iter().map(|key| cache.get(key).cloned()).collect()
+        };
 
-        // 级联处理：顺序敏感 (Order Sensitive)
-        for (idx, p_str) in primes_str.iter().enumerate() {
-            Self::_validate_input(p_str)?;
-            let p = Integer::from_str_radix(p_str, 10)
-                .map_err(|_| pyo3::exceptions::PyValueError::new_err("Invalid prime format"))?;
+        let (current_term, next_depth, ops_consumed, depth_terms) = py.allow_threads(|| {
+            // [Perf] 结构扰动项 G^H(depth + 1 + idx, idx) 与 T 无关，各分支用 Rayon 并行计算
+            // 将 idx 混入哈希，确保即使素数相同，处于不同位置的分支也会产生不同扰动
+            // 相同形状的合并重复出现时直接复用缓存中的结构项
+            let depth_terms: Vec<Integer> = keys
+                .par_iter()
+                .zip(cached.into_par_iter())
+                .map(|(key, cached)| match cached {
+                    Some(term) => term,
+                    None => {
+                        let (depth, idx) = *key;
+                        let mut hasher = Sha256::new();
+                        hasher.update(depth.to_string().as_bytes());
+                        hasher.update(&idx.to_le_bytes()); // Mix Index
+                        let depth_hash_int = Integer::from_digits(&hasher.finalize(), Order::Msf);
+                        Integer::from(generator.pow_mod_ref(&depth_hash_int, modulus).unwrap())
+                    }
+                })
+                .collect();
 
-            // 1. Path evolution: T = T ^ P
-            current_term = current_term.pow_mod(&p, &self.modulus).unwrap();
-            ops_consumed += 1;
+            // 级联处理：顺序敏感 (Order Sensitive)，路径项必须串行
+            let mut current_term = base;
+            for (p, depth_term) in primes.iter().zip(depth_terms.iter()) {
+                // 1. Path evolution: T = T ^ P
+                current_term = current_term.pow_mod(p, modulus).unwrap();
+                // 2. Structural perturbation: T = T * G^H(depth + 1, idx)
+                current_term = (current_term * depth_term) % modulus;
+            }
 
-            // 2. Structural perturbation: T = T * G^H(depth + 1, idx)
-            // 将 idx 混入哈希，确保即使素数相同，处于不同位置的分支也会产生不同扰动
-            next_depth += 1;
-            let mut hasher = Sha256::new();
-            hasher.update(next_depth.to_string().as_bytes());
-            hasher.update(&(idx as u32).to_le_bytes()); // Mix Index
-            let depth_hash_bytes = hasher.finalize();
-            
-            let depth_hash_int = Integer::from_str_radix(&hex::encode(depth_hash_bytes), 16).unwrap();
-            let depth_term = self.generator.clone().pow_mod(&depth_hash_int, &self.modulus).unwrap();
-            
-            current_term = (current_term * depth_term) % &self.modulus;
-            ops_consumed += 1;
+            let n = primes.len() as u64;
+            (current_term, base_depth + n, 2 * n, depth_terms)
+        });
+
+        {
+            let mut cache = self.merge_term_cache.lock().unwrap();
+            for (key, term) in keys.into_iter().zip(depth_terms) {
+                if cache.len() >= DEPTH_TERM_CACHE_LIMIT {
+                    break;
+                }
+                cache.entry(key).or_insert(term);
+            }
         }
         
         // 注意：这种合并方式会显著增加 depth，这符合全息累加器的逻辑（每个分支都增加了复杂性）
         // 并且 op_count 也会根据分支数量线性增加，被熔断机制保护。
 
-        self.op_count += ops_consumed;
-        Ok((current_term.to_string_radix(10), next_depth, ops_consumed))
+        self.op_count.fetch_add(ops_consumed, Ordering::Relaxed);
+        Ok((Self::_bytes(py, &self._to_fixed_le(&current_term)), next_depth, ops_consumed))
     }
 
-    #[staticmethod]
-    fn safe_pow_mod(base_str: String, exp_str: String, modulus_str: String) -> PyResult<String> {
-        Self::_validate_input(&base_str)?;
-        Self::_validate_input(&exp_str)?;
-        Self::_validate_input(&modulus_str)?;
-
-        let base = Integer::from_str_radix(&base_str, 10).unwrap();
-        let exp = Integer::from_str_radix(&exp_str, 10).unwrap();
-        let m = Integer::from_str_radix(&modulus_str, 10).unwrap();
-        
-        let result = base.pow_mod(&exp, &m).unwrap();
-        Ok(result.to_string_radix(10))
+    /// [Perf] 绑定本实例固定模数的模幂：模数已是 Integer，且在构造时校验过，
+    /// 每次调用只需解析底数与指数
+    fn pow_mod(&self, py: Python, base: &[u8], exp: &[u8]) -> PyResult<PyObject> {
+        Self::_validate_bytes(base)?;
+        Self::_validate_bytes(exp)?;
+
+        let base = Self::_from_le(base);
+        let exp = Self::_from_le(exp);
+        let result = py.allow_threads(|| base.pow_mod(&exp, &self.modulus).unwrap());
+        Ok(Self::_bytes(py, &self._to_fixed_le(&result)))
     }
+}
 
-    // --- Helpers ---
+// --- Helpers ---
+// 不暴露给 Python 的内部实现 (返回 rug::Integer 等非 Python 类型)
+impl RustAccumulator {
+    fn _hash_to_prime_int(&self, agent_id: &str) -> PyResult<Integer> {
+        self._inject_heavy_jitter(); // [Fix #3] 增强版 Jitter
+        
+        let mut nonce = 0u64;
+        let prefix = format!("{}:", self.domain_context);
+        let prefix_bytes = prefix.as_bytes();
+        let id_bytes = agent_id.as_bytes();
 
-    fn _compute_transition(&mut self, agent_id: String) -> PyResult<(Integer, u64)> {
-        let p_str = self.hash_to_prime(agent_id)?; 
-        let p_agent = Integer::from_str_radix(&p_str, 10).unwrap(); 
+        // [Perf] 域前缀与 agent_id 只吸收一次，每个 (nonce, i) 从该中间状态克隆
+        // sha2 通过 cpufeatures 在运行时自动分派 SHA-NI / ARMv8 SHA2 指令
+        let mut base_hasher = Sha256::new();
+        base_hasher.update(prefix_bytes);
+        base_hasher.update(id_bytes);
+        let mut candidate_bytes = [0u8; 128];
 
-        let path_term = self.current_t.clone().pow_mod(&p_agent, &self.modulus).unwrap();
-        self.op_count += 1;
+        loop {
+            for i in 0..4 {
+                let mut hasher = base_hasher.clone();
+                hasher.update(&nonce.to_le_bytes());
+                hasher.update(&(i as u32).to_le_bytes());
+                candidate_bytes[i * 32..(i + 1) * 32].copy_from_slice(&hasher.finalize());
+            }
 
-        let depth_hash_bytes = Sha256::digest(self.depth.to_string().as_bytes());
-        let depth_hash_int = Integer::from_str_radix(&hex::encode(depth_hash_bytes), 16).unwrap();
-        
-        let depth_term = self.generator.clone().pow_mod(&depth_hash_int, &self.modulus).unwrap();
-        self.op_count += 1;
+            let mut candidate = Integer::from_digits(&candidate_bytes, Order::Msf);
+            candidate.set_bit(1023, true); 
+            candidate.set_bit(0, true);
+
+            // 不引入轮式筛 (wheel) 改写候选：候选必须是 (domain, agent_id, nonce) 的确定性函数，
+            // 改写会改变 agent -> prime 映射；且 mpz_probab_prime_p 在 Miller-Rabin 之前
+            // 先做小素数试除，合数候选在这一步就被廉价排除
+            if candidate.is_probably_prime(64) != rug::integer::IsPrime::No {
+                return Ok(candidate);
+            }
+
+            nonce += 1;
+            if nonce > 200_000 { 
+                 return Err(pyo3::exceptions::PyRuntimeError::new_err("Prime generation timeout (DoS protection)"));
+            }
+        }
+    }
+
+    fn _compute_transition(&mut self, agent_id: &str) -> PyResult<(Integer, u64)> {
+        let p_agent = self._hash_to_prime_int(agent_id)?;
+
+        let (path_term, depth_term) = match self.depth_term_cache.get(&self.depth) {
+            Some(cached) => {
+                let path_term = Integer::from(self.current_t.pow_mod_ref(&p_agent, &self.modulus).unwrap());
+                (path_term, cached.clone())
+            }
+            None => {
+                let depth_hash_bytes = Sha256::digest(self.depth.to_string().as_bytes());
+                let depth_hash_int = Integer::from_str_radix(&hex::encode(depth_hash_bytes), 16).unwrap();
+                
+                let (path_term, depth_term) = Self::_pow_mod_pair(
+                    (&self.current_t, &p_agent),
+                    (&self.generator, &depth_hash_int),
+                    &self.modulus,
+                );
+                if self.depth_term_cache.len() < DEPTH_TERM_CACHE_LIMIT {
+                    self.depth_term_cache.insert(self.depth, depth_term.clone());
+                }
+                (path_term, depth_term)
+            }
+        };
+        // 计数语义不变 (验证方按每步两次模幂核对 ops)
+        self.op_count.fetch_add(2, Ordering::Relaxed);
 
         let next_t = (path_term * depth_term) % &self.modulus;
         Ok((next_t, self.depth + 1))
     }
 
+    /// [Perf] 双路模幂 (Dual Modexp)
+    /// 路径项 T^P 与结构项 G^H(depth) 互不依赖，两条 lane 分别在两个核心上并发计算
+    fn _pow_mod_pair(a: (&Integer, &Integer), b: (&Integer, &Integer), m: &Integer) -> (Integer, Integer) {
+        thread::scope(|s| {
+            let lane_b = s.spawn(|| Integer::from(b.0.pow_mod_ref(b.1, m).unwrap()));
+            let res_a = Integer::from(a.0.pow_mod_ref(a.1, m).unwrap());
+            (res_a, lane_b.join().unwrap())
+        })
+    }
+
     /// [Fix #3] 增强型随机运算干扰 (Computation-Heavy Jitter)
     /// 使用随机底数和指数进行模幂，掩盖真实运算的功耗特征
     fn _inject_heavy_jitter(&self) {
@@ -291,7 +392,7 @@ impl RustAccumulator {
     }
     
     fn _check_op_limit(&self) -> PyResult<()> {
-        if self.op_count > self.max_op_limit {
+        if self.op_count.load(Ordering::Relaxed) > self.max_op_limit {
             return Err(pyo3::exceptions::PyRuntimeError::new_err(
                 "DoS Protection: Operation count exceeded limit."
             ));
@@ -299,6 +400,28 @@ impl RustAccumulator {
         Ok(())
     }
 
+    fn _byte_width(m: &Integer) -> usize {
+        ((m.significant_bits() + 7) / 8) as usize
+    }
+
+    fn _le_bytes(n: &Integer, width: usize) -> Vec<u8> {
+        let mut buf = n.to_digits::<u8>(Order::Lsf);
+        buf.resize(width, 0);
+        buf
+    }
+
+    fn _to_fixed_le(&self, n: &Integer) -> Vec<u8> {
+        Self::_le_bytes(n, Self::_byte_width(&self.modulus))
+    }
+
+    fn _from_le(buf: &[u8]) -> Integer {
+        Integer::from_digits(buf, Order::Lsf)
+    }
+
+    fn _bytes(py: Python, buf: &[u8]) -> PyObject {
+        PyBytes::new(py, buf).into()
+    }
+
     fn _validate_input(input: &str) -> PyResult<()> {
         if input.len() > MAX_STRING_LEN {
             return Err(pyo3::exceptions::PyValueError::new_err(
@@ -307,4 +430,13 @@ impl RustAccumulator {
         }
         Ok(())
     }
+
+    fn _validate_bytes(input: &[u8]) -> PyResult<()> {
+        if input.len() > MAX_STRING_LEN {
+            return Err(pyo3::exceptions::PyValueError::new_err(
+                format!("Input length {} exceeds maximum safety limit", input.len())
+            ));
+        }
+        Ok(())
+    }
 }
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def ctx():
+    # 小模数上下文：依赖 Rust 扩展的测试共用；扩展不可用时跳过 (security 测试不依赖它)
+    core = pytest.importorskip("holographic_pass.core")
+    return core.CryptoContext(bit_length=512, max_depth=5)
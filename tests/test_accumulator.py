@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("holographic_core")
+
+from holographic_pass.core import HolographicAccumulator
+
+
+def test_tampered_current_t_is_rejected(ctx):
+    acc = HolographicAccumulator(ctx)
+    acc.update_state("alice")
+    acc.current_T += 1
+    with pytest.raises(ValueError, match="State Mismatch"):
+        acc.update_state("bob")
+
+
+def test_in_sync_state_advances(ctx):
+    acc = HolographicAccumulator(ctx)
+    first = acc.update_state("alice")
+    assert acc.update_state("bob") != first
+    assert acc.depth == 2
@@ -0,0 +1,50 @@
+from hashlib import blake2b
+
+import pytest
+
+pytest.importorskip("holographic_core")
+
+from holographic_pass.core import HolographicAccumulator
+
+
+def _run(acc, n):
+    agents = [f"agent-{i}" for i in range(n)]
+    trace = [acc.update_state(a) for a in agents]
+    return agents, trace
+
+
+def test_ring_buffer_keeps_latest_in_order(ctx):
+    acc = HolographicAccumulator(ctx, history_limit=3)
+    agents, trace = _run(acc, 7)
+    history = list(acc.history)
+    assert [e['agent'] for e in history] == agents[-3:]
+    assert [e['T'] for e in history] == trace[-3:]
+
+
+def test_compaction_after_wrap(ctx):
+    acc = HolographicAccumulator(ctx, history_limit=3)
+    agents, trace = _run(acc, 5)
+    acc.compact_history()
+    t_next = acc.update_state("after-compact")
+    width = len(acc._T_buf)
+
+    def fingerprint(t):
+        return blake2b(t.to_bytes(width, "little"), digest_size=acc.FINGERPRINT_SIZE).digest()
+
+    history = list(acc.history)
+    assert [e['agent'] for e in history] == agents[-2:] + ["after-compact"]
+    assert [e['T'] for e in history] == [fingerprint(t) for t in trace[-2:] + [t_next]]
+
+
+def test_none_limit_is_unbounded(ctx):
+    acc = HolographicAccumulator(ctx, history_limit=None)
+    agents, trace = _run(acc, 12)
+    history = list(acc.history)
+    assert [e['agent'] for e in history] == agents
+    assert [e['T'] for e in history] == trace
+
+
+def test_zero_limit_keeps_nothing(ctx):
+    acc = HolographicAccumulator(ctx, history_limit=0)
+    _run(acc, 3)
+    assert list(acc.history) == []
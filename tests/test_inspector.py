@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("holographic_core")
+
+from holographic_pass.core import PrimeRegistry
+from holographic_pass.security import TraceInspector
+
+
+@pytest.fixture(scope="module")
+def inspector(ctx):
+    return TraceInspector(ctx, PrimeRegistry(ctx))
+
+
+def _replay(inspector, witnesses):
+    ctx, t = inspector.ctx, 2
+    for depth, agent in enumerate(witnesses):
+        t = ctx.fast_pow(t, inspector.reg.get_prime(agent)) * ctx.depth_term(depth) % ctx.M
+    return t
+
+
+def test_verify_batch_matches_verify_path(inspector):
+    paths = [["a", "b", "c"], ["a", "b", "d"], ["a"], []]
+    pairs = [(hex(_replay(inspector, w)), w) for w in paths]
+    pairs.append((_replay(inspector, ["a", "b"]) + 1, ["a", "b"]))
+    pairs.append((str(_replay(inspector, ["a"])), ["a"]))
+    pairs.append(("not-a-number", ["a"]))
+    expected = [inspector.verify_path(t, w) for t, w in pairs]
+    assert [ok for ok, _ in expected] == [True, True, True, True, False, True, False]
+    assert expected[-1] == (False, "Malformed target_t")
+    assert inspector.verify_batch(pairs) == expected
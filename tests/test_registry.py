@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("holographic_core")
+
+from holographic_pass.core import PrimeRegistry
+
+
+class _CountingHelper:
+    def __init__(self):
+        self.generated = 0
+
+    def hash_to_prime(self, agent_id):
+        self.generated += 1
+        return (2 * len(agent_id) + 1).to_bytes(4, "little")
+
+    def hash_to_prime_many(self, agent_ids):
+        self.generated += len(agent_ids)
+        return [(2 * len(a) + 1).to_bytes(4, "little") for a in agent_ids]
+
+
+class _Context:
+    def __init__(self):
+        self._prime_helper = _CountingHelper()
+
+
+def test_single_path_stops_at_window_limit():
+    ctx = _Context()
+    reg = PrimeRegistry(ctx)
+    for i in range(reg.MAX_REQUESTS_PER_WINDOW):
+        reg.register_agent(f"agent-{i}")
+    with pytest.raises(RuntimeError, match="Rate Limit"):
+        reg.register_agent("one-too-many")
+    assert ctx._prime_helper.generated == reg.MAX_REQUESTS_PER_WINDOW
+
+
+def test_bulk_path_rejects_oversized_batch_before_generation():
+    ctx = _Context()
+    reg = PrimeRegistry(ctx)
+    with pytest.raises(RuntimeError, match="Rate Limit"):
+        reg.register_indices([f"agent-{i}" for i in range(1000)])
+    assert ctx._prime_helper.generated == 0
+    assert len(reg.request_log) == 0
+
+
+def test_bulk_path_counts_towards_shared_window():
+    ctx = _Context()
+    reg = PrimeRegistry(ctx)
+    reg.register_agents([f"agent-{i}" for i in range(reg.MAX_REQUESTS_PER_WINDOW - 1)])
+    with pytest.raises(RuntimeError, match="Rate Limit"):
+        reg.register_agents(["late-1", "late-2"])
+    # 缓存命中不计入窗口
+    reg.register_agents(["agent-0", "agent-1"])
+    assert ctx._prime_helper.generated == reg.MAX_REQUESTS_PER_WINDOW - 1
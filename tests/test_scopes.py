@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("holographic_core")
+
+from holographic_pass.core import HolographicAccumulator, PrimeRegistry
+from holographic_pass.scopes import SwarmScope, swarm_agent_id, update_global_with_swarm
+
+
+def test_swarm_injection_returns_replayable_agent_id(ctx):
+    reg = PrimeRegistry(ctx)
+    swarm = SwarmScope("team", ctx, reg)
+    swarm.track_sub_task("cat-1")
+    result = swarm.seal_and_export()
+    assert not reg.request_log and not reg._primes
+
+    acc = HolographicAccumulator(ctx)
+    new_t, agent_id = update_global_with_swarm(acc, result)
+    assert new_t == acc.current_T
+    assert agent_id == swarm_agent_id(result)
+    assert list(acc.history)[-1]['agent'] == agent_id
+
+
+def test_swarm_agent_id_binds_ops():
+    result = {"swarm_name": "team", "work_proof": 1, "complexity": 2, "ops": 4}
+    assert swarm_agent_id(result) != swarm_agent_id(dict(result, ops=6))
@@ -0,0 +1,166 @@
+import dataclasses
+import datetime
+
+import pytest
+
+from holographic_pass.models import AgentState
+from holographic_pass.security import StateSealer, TraceInspector, _as_trace_int
+
+
+@dataclasses.dataclass
+class _Record:
+    name: str
+    score: int
+
+
+_PAYLOADS = [
+    "plain text",
+    {"b": 2, "a": [1, 2]},
+    {"nested": (1, 2)},
+    (1, 2, 3),
+    [1, 2, 3],
+    _Record("x", 1),
+    datetime.datetime(2024, 1, 2, 3, 4, 5),
+    42,
+]
+
+
+def _envelopes():
+    envelopes = []
+    for i, payload in enumerate(_PAYLOADS):
+        state = AgentState(task_id=f"task-{i}", payload=payload)
+        state.meta.trace_t = 0xABCDEF + i
+        envelopes.append(StateSealer.seal(state))
+    # 一个篡改过的信封，确保并行路径也能拒绝
+    tampered = StateSealer.seal(AgentState(task_id="bad", payload="original"))
+    tampered["body"]["payload"] = "forged"
+    envelopes.append(tampered)
+    return envelopes
+
+
+def test_verify_many_matches_verify_across_payload_types():
+    envelopes = _envelopes()
+    expected = [StateSealer.verify(e) for e in envelopes]
+    assert expected == [True] * len(_PAYLOADS) + [False]
+    assert StateSealer.verify_many(envelopes, workers=2, chunksize=1) == expected
+
+
+def _sealed():
+    state = AgentState(task_id="t", payload={"k": "v"})
+    state.meta.trace_t = 0x1234
+    return StateSealer.seal(state)
+
+
+@pytest.mark.parametrize("key, value", [
+    ("trace_t", "not-hex"),
+    ("trace_t", "12ab"),
+    ("trace_t", None),
+    ("timestamp", "yesterday"),
+    ("ops", "many"),
+    ("nonce", 12345),
+    ("ops", -1),
+    ("ops", 2**64),
+    ("trace_t", -5),
+    ("timestamp", 10**400),
+])
+def test_malformed_header_values_fail_closed(key, value):
+    envelope = _sealed()
+    envelope["header"][key] = value
+    assert StateSealer.verify(envelope) is False
+    assert StateSealer.verify(envelope, deep=False) is False
+    assert StateSealer.verify_batch([envelope, _sealed()]) == [False, True]
+
+
+def test_header_trace_t_round_trips_through_verify_path_parser():
+    envelope = _sealed()
+    assert envelope["header"]["trace_t"] == "0x1234"
+    assert _as_trace_int(envelope["header"]["trace_t"]) == 0x1234
+    assert _as_trace_int(0x1234) == 0x1234
+
+
+def test_trace_parser_accepts_decimal_and_rejects_bare_hex():
+    assert _as_trace_int(str(0x1234)) == 0x1234
+    for bad in ("12ab", "", "-5", "1.5"):
+        with pytest.raises(ValueError):
+            _as_trace_int(bad)
+
+
+def test_verify_path_rejects_malformed_target():
+    inspector = TraceInspector(None, None)
+    assert inspector.verify_path("12ab", []) == (False, "Malformed target_t")
+
+
+@pytest.mark.parametrize("payload_hash", ["zz", "abc", 123, None])
+def test_shallow_verify_rejects_malformed_payload_hash(payload_hash):
+    envelope = _sealed()
+    envelope["header"]["payload_hash"] = payload_hash
+    assert StateSealer.verify(envelope, deep=False) is False
+
+
+def test_shallow_verify_requires_payload_hash():
+    envelope = _sealed()
+    del envelope["header"]["payload_hash"]
+    assert StateSealer.verify(envelope, deep=False) is False
+    assert StateSealer.verify(_sealed(), deep=False) is True
+
+
+_BAD_WITNESS_COMMITS = [
+    {"t": ["1f"]},
+    {"stride": 0, "t": ["1f"]},
+    {"stride": "2", "t": ["1f"]},
+    {"stride": 2, "t": ["not-hex"]},
+    {"stride": 2, "t": [31]},
+    {"stride": 2, "t": "1f"},
+    ["1f"],
+]
+
+
+@pytest.mark.parametrize("witness_commit", _BAD_WITNESS_COMMITS)
+def test_verify_rejects_malformed_witness_commit(witness_commit):
+    envelope = _sealed()
+    envelope["header"]["witness_commit"] = witness_commit
+    assert StateSealer.verify(envelope) is False
+    assert StateSealer.verify_batch([envelope]) == [False]
+
+
+@pytest.mark.parametrize("witness_commit", _BAD_WITNESS_COMMITS)
+def test_verify_path_rejects_malformed_witness_commit(witness_commit):
+    header = _sealed()["header"]
+    header["witness_commit"] = witness_commit
+    result = TraceInspector(None, None).verify_path(header["trace_t"], [], header)
+    assert result == (False, "Malformed witness_commit")
+
+
+def test_well_formed_witness_commit_verifies():
+    commit = StateSealer.make_witness_commit([3, 5, 7, 11], stride=2)
+    envelope = StateSealer.seal(AgentState(task_id="t", payload="p"), witness_commit=commit)
+    assert StateSealer.verify(envelope) is True
+
+
+@pytest.mark.parametrize("forged", [float("inf"), float("-inf"), float("nan")])
+def test_non_finite_floats_do_not_collide_with_none(forged):
+    envelope = StateSealer.seal(AgentState(task_id="t", payload={"amount": None}))
+    envelope["body"]["payload"] = {"amount": forged}
+    assert StateSealer.verify(envelope) is False
+    assert StateSealer.verify_batch([envelope]) == [False]
+
+
+def test_prefetch_is_ordered_bounded_and_cancelled_on_close(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from holographic_pass import security
+
+    calls = []
+
+    def square(i):
+        calls.append(i)
+        return i * i
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(security, "_PREFETCH_POOL", pool)
+        assert list(security._prefetched(square, 20)) == [i * i for i in range(20)]
+
+        calls.clear()
+        terms = security._prefetched(square, 1000)
+        assert next(terms) == 0
+        terms.close()
+    assert len(calls) <= security._PREFETCH_WINDOW + 1